@@ -40,18 +40,30 @@ REM Create build directory
 if not exist "build" mkdir build
 cd build
 
+REM Reuse an existing configuration; cmake --build re-runs the configure
+REM step on its own whenever CMakeLists.txt changes
+if not exist "CMakeCache.txt" goto configure
+echo Existing CMake cache found, skipping configure step
+goto build
+
+:configure
 echo Configuring CMake...
-cmake .. -DCMAKE_TOOLCHAIN_FILE="%VCPKG_ROOT%\scripts\buildsystems\vcpkg.cmake" -DCMAKE_BUILD_TYPE=Release
+REM Keep the compiler-probe chatter off the console; it is shown only on failure
+cmake .. -DCMAKE_TOOLCHAIN_FILE="%VCPKG_ROOT%\scripts\buildsystems\vcpkg.cmake" -DCMAKE_BUILD_TYPE=Release > cmake_configure.log 2>&1
 
 if %ERRORLEVEL% NEQ 0 (
+    type cmake_configure.log
+    REM A failed configure still writes the cache; drop it so the next run reconfigures
+    if exist "CMakeCache.txt" del "CMakeCache.txt"
     echo Error: CMake configuration failed
     pause
     exit /b 1
 )
 
+:build
 echo.
 echo Building project...
-cmake --build . --config Release
+cmake --build . --config Release --parallel %NUMBER_OF_PROCESSORS%
 
 if %ERRORLEVEL% NEQ 0 (
     echo Error: Build failed
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-time build of the technical indicator kernel
+=====================================================
+
+Compiles the numba kernel from setup_paper_trading.py into the
+starsim_indicators_aot_<source hash> extension next to this script, so setup
+runs load machine code directly instead of paying the JIT compile on first use.
+The hash changes whenever the kernel source does, so rerun this after
+updating; until then setup falls back to the JIT kernel.
+Run once after installing dependencies:
+
+    python build_indicators_aot.py
+"""
+
+from pathlib import Path
+
+from numba.pycc import CC
+
+import setup_paper_trading
+
+# high, low, close, volume, out (n x len(INDICATOR_COLUMNS))
+KERNEL_SIGNATURE = 'void(f8[:], f8[:], f8[:], f8[:], f8[:, :])'
+
+def main():
+    output_dir = Path(__file__).resolve().parent
+    
+    # Builds of older kernel sources can never be loaded again
+    for stale in output_dir.glob('starsim_indicators_aot*'):
+        if not stale.name.startswith(setup_paper_trading.AOT_MODULE + '.'):
+            stale.unlink()
+    
+    cc = CC(setup_paper_trading.AOT_MODULE)
+    cc.output_dir = str(output_dir)
+    cc.export('indicators_kernel', KERNEL_SIGNATURE)(
+        setup_paper_trading._indicators_kernel.py_func
+    )
+    
+    print("🔨 Compiling indicator kernel ahead of time...")
+    cc.compile()
+    print(f"✅ Built {setup_paper_trading.AOT_MODULE} in {cc.output_dir}")
+
+if __name__ == "__main__":
+    main()
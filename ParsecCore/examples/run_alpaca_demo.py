@@ -12,6 +12,65 @@ import sys
 import subprocess
 import time
 from datetime import datetime
+from pathlib import Path
+
+# Resolved once so the demo works from any working directory
+PARSEC_DIR = Path(__file__).resolve().parent.parent
+BUILD_DIR = PARSEC_DIR / "build" / "Release"
+EXE_PATH = BUILD_DIR / "alpaca_live_trading.exe"
+
+# Static demo content, rendered once at import
+_RECOMMENDATIONS = {
+    "🤖 AI/Technology Leaders": [
+        ("NVDA", "$875", "AI chip leader, massive growth potential"),
+        ("MSFT", "$420", "Cloud computing + AI integration"),
+        ("GOOGL", "$140", "Undervalued AI leader with search dominance"),
+        ("PLTR", "$18.50", "Government AI contracts, strong fundamentals")
+    ],
+    "🚀 Growth Opportunities": [
+        ("TSLA", "$240", "Electric vehicle + energy storage leader"),
+        ("SNOW", "$140", "Cloud data platform with enterprise adoption"),
+        ("CRWD", "$285", "Cybersecurity growth in AI era"),
+        ("ARKK", "$48", "Disruptive innovation ETF")
+    ],
+    "🛡️ Diversified & Defensive": [
+        ("AAPL", "$185", "Stable ecosystem with AI hardware potential"),
+        ("SPY", "$485", "Broad market exposure for stability"),
+        ("JNJ", "$155", "Healthcare defensive play"),
+        ("VTI", "$245", "Total US market diversification")
+    ]
+}
+
+def _render_recommendations(recommendations):
+    """Render the recommendations table as a single block of text"""
+    lines = []
+    for category, stocks in recommendations.items():
+        lines.append(f"\n{category}:")
+        for symbol, price, description in stocks:
+            lines.append(f"  • {symbol:6} ({price:>6}) - {description}")
+    return "\n".join(lines) + "\n"
+
+_RECOMMENDATIONS_TEXT = _render_recommendations(_RECOMMENDATIONS)
+
+_STRATEGY_TEXT = "\n".join([
+    "🎯 Multi-Strategy Approach:",
+    "  1. Momentum Strategy (Primary)",
+    "     - Buy when fast SMA > slow SMA + threshold",
+    "     - Sell when fast SMA < slow SMA - threshold",
+    "     - 5-day and 20-day moving averages",
+    "     - 2% momentum threshold",
+    "",
+    "  2. Position Sizing & Risk Management",
+    "     - 5% of portfolio per trade",
+    "     - 5% stop loss protection",
+    "     - Maximum 10 positions",
+    "     - Cash reserves maintained",
+    "",
+    "  3. Enhanced Signals for AI/Growth Stocks",
+    "     - Higher confidence for NVDA, PLTR, TSLA",
+    "     - Sector-specific adjustments",
+    "     - Volatility-based positioning",
+]) + "\n"
 
 def print_header(title):
     """Print a formatted header"""
@@ -25,19 +84,36 @@ def print_section(title):
     print(f"📋 {title}")
     print(f"{'-'*40}")
 
-def run_command(command, description):
-    """Run a command and handle errors"""
+def run_command(argv, description, capture=False):
+    """Run a command, given as an argv list, without a shell.
+    
+    Shell strings are rejected rather than split: POSIX splitting mangles
+    Windows paths and would pass operators like && through as arguments.
+    Output goes straight to the console unless capture is set, in which case
+    it is collected and a short preview is printed on success.
+    """
+    if isinstance(argv, str):
+        raise TypeError("run_command takes an argv list, not a shell string")
+    
     print(f"\n▶️  {description}")
-    print(f"Command: {command}")
+    argv = list(argv)
+    print(f"Command: {subprocess.list2cmdline(argv)}")
     
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        if capture:
+            result = subprocess.run(argv, capture_output=True, text=True, errors='replace')
+        else:
+            result = subprocess.run(argv)
+        
         if result.returncode == 0:
             print(f"✅ Success!")
-            if result.stdout:
+            if capture and result.stdout:
                 print(f"Output: {result.stdout[:200]}...")
         else:
-            print(f"❌ Error: {result.stderr}")
+            if capture and result.stderr:
+                print(f"❌ Error: {result.stderr}")
+            else:
+                print(f"❌ Error: command exited with code {result.returncode}")
             return False
     except Exception as e:
         print(f"❌ Exception: {e}")
@@ -49,8 +125,9 @@ def check_credentials():
     """Check if Alpaca credentials are set"""
     print_section("Checking Alpaca API Credentials")
     
-    api_key = os.getenv('ALPACA_API_KEY')
-    secret_key = os.getenv('ALPACA_SECRET_KEY')
+    env = os.environ
+    api_key = env.get('ALPACA_API_KEY')
+    secret_key = env.get('ALPACA_SECRET_KEY')
     
     if api_key and secret_key:
         print("✅ Alpaca API credentials found in environment variables")
@@ -71,54 +148,12 @@ def check_credentials():
 def demo_investment_recommendations():
     """Display investment recommendations"""
     print_section("2024 Investment Recommendations")
-    
-    recommendations = {
-        "🤖 AI/Technology Leaders": [
-            ("NVDA", "$875", "AI chip leader, massive growth potential"),
-            ("MSFT", "$420", "Cloud computing + AI integration"),
-            ("GOOGL", "$140", "Undervalued AI leader with search dominance"),
-            ("PLTR", "$18.50", "Government AI contracts, strong fundamentals")
-        ],
-        "🚀 Growth Opportunities": [
-            ("TSLA", "$240", "Electric vehicle + energy storage leader"),
-            ("SNOW", "$140", "Cloud data platform with enterprise adoption"),
-            ("CRWD", "$285", "Cybersecurity growth in AI era"),
-            ("ARKK", "$48", "Disruptive innovation ETF")
-        ],
-        "🛡️ Diversified & Defensive": [
-            ("AAPL", "$185", "Stable ecosystem with AI hardware potential"),
-            ("SPY", "$485", "Broad market exposure for stability"),
-            ("JNJ", "$155", "Healthcare defensive play"),
-            ("VTI", "$245", "Total US market diversification")
-        ]
-    }
-    
-    for category, stocks in recommendations.items():
-        print(f"\n{category}:")
-        for symbol, price, description in stocks:
-            print(f"  • {symbol:6} ({price:>6}) - {description}")
+    sys.stdout.write(_RECOMMENDATIONS_TEXT)
 
 def demo_strategy_overview():
     """Display strategy overview"""
     print_section("Trading Strategy Overview")
-    
-    print("🎯 Multi-Strategy Approach:")
-    print("  1. Momentum Strategy (Primary)")
-    print("     - Buy when fast SMA > slow SMA + threshold")
-    print("     - Sell when fast SMA < slow SMA - threshold")
-    print("     - 5-day and 20-day moving averages")
-    print("     - 2% momentum threshold")
-    
-    print("\n  2. Position Sizing & Risk Management")
-    print("     - 5% of portfolio per trade")
-    print("     - 5% stop loss protection")
-    print("     - Maximum 10 positions")
-    print("     - Cash reserves maintained")
-    
-    print("\n  3. Enhanced Signals for AI/Growth Stocks")
-    print("     - Higher confidence for NVDA, PLTR, TSLA")
-    print("     - Sector-specific adjustments")
-    print("     - Volatility-based positioning")
+    sys.stdout.write(_STRATEGY_TEXT)
 
 def run_demo():
     """Run the complete demo"""
@@ -134,7 +169,9 @@ def run_demo():
     # Check credentials
     if not check_credentials():
         print("\n⚠️  Demo will run in simulation mode without real API")
-        time.sleep(2)
+        # Pause so an interactive user can read the warning; scripted runs skip it
+        if sys.stdout.isatty():
+            time.sleep(2)
     
     # Show investment recommendations
     demo_investment_recommendations()
@@ -150,24 +187,21 @@ def run_demo():
         print("Demo cancelled by user")
         return
     
-    # Change to build directory
-    build_dir = "build/Debug"
-    if not os.path.exists(build_dir):
-        print(f"❌ Build directory not found: {build_dir}")
-        print("Please build the project first:")
-        print("  cmake --build . --config Debug")
+    # One stat on the executable; the build directory is only probed to explain a miss
+    if not EXE_PATH.is_file():
+        if not BUILD_DIR.is_dir():
+            print(f"❌ Build directory not found: {BUILD_DIR}")
+            print("Please build the project first:")
+            print("  cmake --build . --config Release --parallel")
+        else:
+            print(f"❌ Executable not found: {EXE_PATH}")
+            print("Please build the alpaca_live_trading target first")
         return
     
     # Run the live trading application
     print_section("Starting Live Trading Application")
     
-    exe_path = os.path.join(build_dir, "alpaca_live_trading.exe")
-    if not os.path.exists(exe_path):
-        print(f"❌ Executable not found: {exe_path}")
-        print("Please build the alpaca_live_trading target first")
-        return
-    
-    print(f"🚀 Launching: {exe_path}")
+    print(f"🚀 Launching: {EXE_PATH}")
     print("📊 Expected behavior:")
     print("  - API connection test")
     print("  - Market status check")
@@ -180,7 +214,7 @@ def run_demo():
     
     try:
         # Run the executable
-        subprocess.run([exe_path], cwd=build_dir, check=True)
+        subprocess.run([EXE_PATH], cwd=BUILD_DIR, check=True)
         
     except KeyboardInterrupt:
         print("\n\n⚠️  Demo interrupted by user")
@@ -191,7 +225,7 @@ def run_demo():
     
     print_section("Demo Complete")
     print("📊 Check the following files for results:")
-    print(f"  - {build_dir}/live_trading_results.txt")
+    print(f"  - {BUILD_DIR / 'live_trading_results.txt'}")
     print("  - Console output above")
     
     print("\n🎉 Next Steps:")
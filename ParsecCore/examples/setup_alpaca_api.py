@@ -9,13 +9,61 @@ for live paper trading with the StarSim trading system.
 
 import os
 import sys
+import csv
 import json
 import time
-import requests
-import pandas as pd
+import threading
+import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
-import alpaca_trade_api as tradeapi
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def write_json(path: str, obj):
+    """Write obj to path as indented JSON, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=str)
+
+# 2024 Investment Universe, by category
+CATEGORIES = {
+    'AI_TECH': ['NVDA', 'GOOGL', 'MSFT', 'AAPL', 'AMZN', 'META'],
+    'GROWTH': ['TSLA', 'PLTR', 'SNOW', 'CRWD', 'DDOG', 'MDB', 'NET', 'OKTA'],
+    'ETFS': ['SPY', 'QQQ', 'VTI', 'ARKK', 'XLK', 'SMH'],
+    'DEFENSIVE': ['JNJ', 'PG', 'KO', 'WMT', 'BRK.B', 'VZ']
+}
+
+# Every symbol traded, deduplicated across categories
+UNIVERSE = sorted({s for symbols in CATEGORIES.values() for s in symbols})
+
+class RateLimiter:
+    """Thread-safe token bucket that keeps requests under the Alpaca rate limit"""
+    def __init__(self, rate_per_minute: int = 200, burst: int = 8):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
 
 class AlpacaSetup:
     def __init__(self):
@@ -23,6 +71,8 @@ class AlpacaSetup:
         self.secret_key = None
         self.base_url = "https://paper-api.alpaca.markets"
         self.api = None
+        self.rate_limiter = RateLimiter()
+        self._quote_cache = {}  # symbol -> (fetch time, quote)
         
     def get_credentials(self):
         """Get API credentials from user input or environment variables"""
@@ -30,8 +80,9 @@ class AlpacaSetup:
         print("=" * 50)
         
         # Check environment variables first
-        env_api_key = os.getenv('ALPACA_API_KEY')
-        env_secret_key = os.getenv('ALPACA_SECRET_KEY')
+        env = os.environ
+        env_api_key = env.get('ALPACA_API_KEY')
+        env_secret_key = env.get('ALPACA_SECRET_KEY')
         
         if env_api_key and env_secret_key:
             print("✅ Found credentials in environment variables")
@@ -62,8 +113,16 @@ export ALPACA_SECRET_KEY="{self.secret_key}"
 # source alpaca_env.sh
 """
         
-        with open('alpaca_env.sh', 'w') as f:
-            f.write(env_content)
+        # Skip the write when the file already holds these credentials
+        try:
+            with open('alpaca_env.sh') as f:
+                unchanged = f.read() == env_content
+        except OSError:
+            unchanged = False
+        
+        if not unchanged:
+            with open('alpaca_env.sh', 'w') as f:
+                f.write(env_content)
         
         print("✅ Credentials saved to alpaca_env.sh")
         print("   Run 'source alpaca_env.sh' to load them")
@@ -76,6 +135,10 @@ export ALPACA_SECRET_KEY="{self.secret_key}"
         print("=" * 30)
         
         try:
+            import requests
+            import alpaca_trade_api as tradeapi
+            from requests.adapters import HTTPAdapter
+            
             self.api = tradeapi.REST(
                 self.api_key,
                 self.secret_key,
@@ -83,6 +146,14 @@ export ALPACA_SECRET_KEY="{self.secret_key}"
                 api_version='v2'
             )
             
+            # Share keep-alive connections to the trading and data hosts across
+            # every setup call, sized for the concurrent historical download
+            session = getattr(self.api, '_session', None)
+            if session is None:
+                session = requests.Session()
+                self.api._session = session
+            session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=8))
+            
             # Test account access
             account = self.api.get_account()
             print(f"✅ Connection successful!")
@@ -126,29 +197,44 @@ export ALPACA_SECRET_KEY="{self.secret_key}"
             print(f"❌ Error getting market status: {e}")
             return False
     
+    def _cached_quotes(self, symbols: List[str], ttl: float = 10.0) -> Dict:
+        """Get latest quotes, only requesting symbols not fetched within the last ttl seconds"""
+        now = time.monotonic()
+        stale = [s for s in symbols
+                 if s not in self._quote_cache or now - self._quote_cache[s][0] >= ttl]
+        
+        if stale:
+            fresh = self.api.get_latest_quotes(stale, feed='iex')
+            for symbol, quote in fresh.items():
+                self._quote_cache[symbol] = (now, quote)
+        
+        return {s: self._quote_cache[s][1] for s in symbols
+                if s in self._quote_cache and now - self._quote_cache[s][0] < ttl}
+    
     def get_sample_quotes(self, symbols: List[str] = None):
         """Get sample quotes for testing"""
         if symbols is None:
             symbols = ['AAPL', 'MSFT', 'GOOGL', 'NVDA', 'TSLA', 'SPY']
         
-        print(f"\n📈 Sample Quotes for {len(symbols)} symbols")
-        print("=" * 40)
+        lines = [f"\n📈 Sample Quotes for {len(symbols)} symbols", "=" * 40]
         
         try:
-            quotes = self.api.get_latest_quotes(symbols, feed='iex')
+            quotes = self._cached_quotes(symbols)
             
             for symbol in symbols:
-                if symbol in quotes:
-                    quote = quotes[symbol]
-                    print(f"{symbol:6} | Bid: ${quote.bid_price:8.2f} | Ask: ${quote.ask_price:8.2f} | "
-                          f"Spread: ${quote.ask_price - quote.bid_price:6.2f}")
+                quote = quotes.get(symbol)
+                if quote is not None:
+                    lines.append(f"{symbol:6} | Bid: ${quote.bid_price:8.2f} | Ask: ${quote.ask_price:8.2f} | "
+                                 f"Spread: ${quote.ask_price - quote.bid_price:6.2f}")
                 else:
-                    print(f"{symbol:6} | No quote available")
+                    lines.append(f"{symbol:6} | No quote available")
             
+            sys.stdout.write("\n".join(lines) + "\n")
             return quotes
             
         except Exception as e:
-            print(f"❌ Error getting quotes: {e}")
+            lines.append(f"❌ Error getting quotes: {e}")
+            sys.stdout.write("\n".join(lines) + "\n")
             return None
     
     def test_order_placement(self):
@@ -185,50 +271,53 @@ export ALPACA_SECRET_KEY="{self.secret_key}"
     
     def generate_trading_universe(self):
         """Generate recommended trading universe with current prices"""
-        print("\n🌟 Generating Trading Universe")
-        print("=" * 35)
-        
-        # 2024 Investment Universe
-        universe = {
-            'AI_TECH': ['NVDA', 'GOOGL', 'MSFT', 'AAPL', 'AMZN', 'META'],
-            'GROWTH': ['TSLA', 'PLTR', 'SNOW', 'CRWD', 'DDOG', 'MDB', 'NET'],
-            'ETFS': ['SPY', 'QQQ', 'VTI', 'ARKK', 'XLK', 'SMH'],
-            'DEFENSIVE': ['JNJ', 'PG', 'KO', 'WMT', 'BRK.B', 'VZ']
-        }
+        lines = ["\n🌟 Generating Trading Universe", "=" * 35]
         
         trading_data = {}
         
-        for category, symbols in universe.items():
-            print(f"\n{category}:")
-            category_data = {}
+        try:
+            # One request for the whole universe instead of one per category
+            quotes = self._cached_quotes(UNIVERSE)
+        except Exception as e:
+            lines.append(f"  ❌ Error getting quotes: {e}")
+            quotes = None
+        
+        if quotes is not None:
+            # Compute mid prices and spreads for the whole universe in one vector pass
+            present = [s for s in UNIVERSE if s in quotes]
+            bids = np.fromiter((quotes[s].bid_price for s in present), dtype=np.float64, count=len(present))
+            asks = np.fromiter((quotes[s].ask_price for s in present), dtype=np.float64, count=len(present))
+            mids = 0.5 * (bids + asks)
+            spreads = asks - bids
+            prices = dict(zip(present, zip(mids.tolist(), bids.tolist(), asks.tolist(), spreads.tolist())))
             
-            try:
-                quotes = self.api.get_latest_quotes(symbols, feed='iex')
+            for category, symbols in CATEGORIES.items():
+                lines.append(f"\n{category}:")
+                category_data = {}
                 
                 for symbol in symbols:
-                    if symbol in quotes:
-                        quote = quotes[symbol]
-                        mid_price = (quote.bid_price + quote.ask_price) / 2
+                    entry = prices.get(symbol)
+                    if entry is not None:
+                        mid_price, bid, ask, spread = entry
                         category_data[symbol] = {
                             'price': mid_price,
-                            'bid': quote.bid_price,
-                            'ask': quote.ask_price,
-                            'spread': quote.ask_price - quote.bid_price,
+                            'bid': bid,
+                            'ask': ask,
+                            'spread': spread,
                             'category': category
                         }
                         
-                        print(f"  {symbol:6} | ${mid_price:8.2f} | Spread: ${quote.ask_price - quote.bid_price:5.2f}")
+                        lines.append(f"  {symbol:6} | ${mid_price:8.2f} | Spread: ${spread:5.2f}")
                     else:
-                        print(f"  {symbol:6} | No quote available")
+                        lines.append(f"  {symbol:6} | No quote available")
                 
                 trading_data[category] = category_data
-                
-            except Exception as e:
-                print(f"  ❌ Error getting quotes for {category}: {e}")
+        
+        # Emit the whole report in a single write
+        sys.stdout.write("\n".join(lines) + "\n")
         
         # Save to JSON
-        with open('trading_universe.json', 'w') as f:
-            json.dump(trading_data, f, indent=2, default=str)
+        write_json('trading_universe.json', trading_data)
         
         print(f"\n✅ Trading universe saved to trading_universe.json")
         return trading_data
@@ -261,12 +350,7 @@ export ALPACA_SECRET_KEY="{self.secret_key}"
                 "rsi_oversold": 30,
                 "rsi_overbought": 70
             },
-            "universe": [
-                "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA",
-                "PLTR", "SNOW", "CRWD", "DDOG", "MDB", "NET", "OKTA",
-                "SPY", "QQQ", "VTI", "ARKK", "XLK", "SMH",
-                "JNJ", "PG", "KO", "WMT", "BRK.B", "VZ"
-            ],
+            "universe": UNIVERSE,
             "risk_management": {
                 "max_portfolio_heat": 0.20,
                 "max_correlation": 0.7,
@@ -275,13 +359,36 @@ export ALPACA_SECRET_KEY="{self.secret_key}"
             }
         }
         
-        with open('live_trading_config.json', 'w') as f:
-            json.dump(config, f, indent=2)
+        write_json('live_trading_config.json', config)
         
         print("✅ Configuration saved to live_trading_config.json")
         return config
     
-    def download_historical_data(self, days_back: int = 30):
+    def _fetch_bars(self, symbol: str, start: str, end: str) -> int:
+        """Download daily bars for one symbol and save them to CSV"""
+        import alpaca_trade_api as tradeapi
+        
+        self.rate_limiter.acquire()
+        bars = self.api.get_bars(
+            symbol,
+            tradeapi.TimeFrame.Day,
+            start,
+            end,
+            feed='iex'
+        )
+        
+        # Write bars row by row rather than building a DataFrame just to save it
+        count = 0
+        with open(f'historical_data_{symbol}.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            for bar in bars:
+                writer.writerow([bar.t, bar.o, bar.h, bar.l, bar.c, bar.v])
+                count += 1
+        
+        return count
+    
+    def download_historical_data(self, days_back: int = 30, max_workers: int = 8):
         """Download historical data for backtesting"""
         print(f"\n📊 Downloading {days_back} days of historical data")
         print("=" * 50)
@@ -291,26 +398,23 @@ export ALPACA_SECRET_KEY="{self.secret_key}"
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days_back)
+            start = start_date.strftime('%Y-%m-%d')
+            end = end_date.strftime('%Y-%m-%d')
             
-            for symbol in symbols:
-                try:
-                    bars = self.api.get_bars(
-                        symbol,
-                        tradeapi.TimeFrame.Day,
-                        start_date.strftime('%Y-%m-%d'),
-                        end_date.strftime('%Y-%m-%d'),
-                        feed='iex'
-                    )
-                    
-                    df = bars.df
-                    df.to_csv(f'historical_data_{symbol}.csv')
-                    
-                    print(f"✅ {symbol}: {len(df)} bars downloaded")
-                    
-                except Exception as e:
-                    print(f"❌ {symbol}: {e}")
+            # Requests are latency-bound, so run them concurrently and let the
+            # rate limiter (rather than a fixed sleep) keep us under the API cap
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._fetch_bars, symbol, start, end): symbol
+                    for symbol in symbols
+                }
                 
-                time.sleep(0.2)  # Rate limiting
+                for future in as_completed(futures):
+                    symbol = futures[future]
+                    try:
+                        print(f"✅ {symbol}: {future.result()} bars downloaded")
+                    except Exception as e:
+                        print(f"❌ {symbol}: {e}")
             
             print("✅ Historical data download complete")
             
@@ -9,14 +9,348 @@ and provides utilities for monitoring and analysis.
 
 import os
 import json
+import time
+import shutil
+import hashlib
+import inspect
+import importlib
 import requests
 import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, GoodFriday, USMartinLutherKingJr, USPresidentsDay,
+    USMemorialDay, USLaborDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+from pandas.tseries.offsets import CustomBusinessDay
 from datetime import datetime, timedelta
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import yfinance as yf
 import numpy as np
 from typing import Dict, List, Tuple
+import matplotlib
+matplotlib.use('Agg')  # Render straight to file, no GUI backend
 import matplotlib.pyplot as plt
-import seaborn as sns
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: run kernels as plain Python"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+def write_json(path: str, obj):
+    """Write obj to path as indented JSON, using orjson when it is installed"""
+    if orjson is not None:
+        Path(path).write_bytes(
+            orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=str)
+
+# Parquet file holding every downloaded symbol, indexed by (symbol, Date)
+MARKET_DATA_PATH = 'data/market.parquet'
+
+# Downloads are memoized here, keyed by universe and date range
+CACHE_DIR = Path.home() / '.cache' / 'starsim'
+CACHE_MAX_AGE = 24 * 60 * 60  # seconds
+
+# Columns added by calculate_technical_indicators, in output order
+INDICATOR_COLUMNS = [
+    'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26', 'RSI',
+    'MACD', 'MACD_Signal', 'MACD_Histogram',
+    'BB_Middle', 'BB_Upper', 'BB_Lower', 'BB_Width', 'BB_Position',
+    'Volume_SMA', 'Volume_Ratio',
+    'Momentum_10', 'Momentum_20', 'Momentum_50',
+    'Volatility_20', 'TR', 'ATR'
+]
+
+class _NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE market holidays (unlike the federal calendar: Good Friday
+    is closed, Columbus Day and Veterans Day are trading days)"""
+    rules = [
+        # A Saturday New Year's Day is not observed on the Friday before
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-06-19",
+                observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday)
+    ]
+
+@njit(cache=True)
+def _div(a, b):
+    """Divide with NumPy semantics (inf/nan instead of ZeroDivisionError)"""
+    if b != 0.0:
+        return a / b
+    if a > 0.0:
+        return np.inf
+    if a < 0.0:
+        return -np.inf
+    return np.nan
+
+@njit(cache=True)
+def _kahan_add(total, comp, value):
+    """Add value to a running sum with Kahan compensation, returning (total, comp)"""
+    y = value - comp
+    t = total + y
+    return t, (t - total) - y
+
+@njit(cache=True, nogil=True)
+def _wilder_rsi(close, period, rsi):
+    """RSI with Wilder's smoothing: avg = (avg * (period - 1) + x) / period.
+    
+    Missing closes are skipped: their deltas leave the averages untouched and
+    the RSI at those bars stays NaN. Entries before the averages are seeded
+    are left untouched.
+    """
+    n = close.shape[0]
+    
+    # Seed with the simple average of the first `period` valid gains and losses
+    avg_gain = avg_loss = 0.0
+    seen = 0
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        if np.isnan(delta):
+            continue
+        if seen < period:
+            avg_gain += max(delta, 0.0)
+            avg_loss += max(-delta, 0.0)
+            seen += 1
+            if seen < period:
+                continue
+            avg_gain /= period
+            avg_loss /= period
+        else:
+            avg_gain = (avg_gain * (period - 1) + max(delta, 0.0)) / period
+            avg_loss = (avg_loss * (period - 1) + max(-delta, 0.0)) / period
+        rsi[i] = 100.0 - _div(100.0, 1.0 + _div(avg_gain, avg_loss))
+
+@njit(cache=True, nogil=True)
+def _indicators_kernel(high, low, close, volume, out):
+    """Compute every technical indicator in a single forward pass.
+    
+    Rolling windows keep running sums instead of rescanning the window and the
+    EMAs use the recursive form of pandas' adjusted ewm, so each bar is O(1).
+    The sums behind the rolling variances and ATR are Kahan-compensated so
+    add/subtract drift does not build up over long series.
+    NaN inputs are handled like pandas: rolling sums skip them and only report
+    once the window holds a full set of valid values again, and the EMAs decay
+    through them without adding anything.
+    Results are written into out, an (n, len(INDICATOR_COLUMNS)) buffer whose
+    columns follow INDICATOR_COLUMNS.
+    """
+    n = close.shape[0]
+    out[:] = np.nan
+    sma_20 = out[:, 0]
+    sma_50 = out[:, 1]
+    ema_12 = out[:, 2]
+    ema_26 = out[:, 3]
+    rsi = out[:, 4]
+    macd = out[:, 5]
+    macd_signal = out[:, 6]
+    macd_hist = out[:, 7]
+    bb_middle = out[:, 8]
+    bb_upper = out[:, 9]
+    bb_lower = out[:, 10]
+    bb_width = out[:, 11]
+    bb_position = out[:, 12]
+    volume_sma = out[:, 13]
+    volume_ratio = out[:, 14]
+    momentum_10 = out[:, 15]
+    momentum_20 = out[:, 16]
+    momentum_50 = out[:, 17]
+    volatility_20 = out[:, 18]
+    tr = out[:, 19]
+    atr = out[:, 20]
+    
+    _wilder_rsi(close, 14, rsi)
+    
+    # Adjusted EWM weights: ema = num / den with both decayed by (1 - alpha)
+    d12 = 1.0 - 2.0 / 13.0
+    d26 = 1.0 - 2.0 / 27.0
+    d9 = 1.0 - 2.0 / 10.0
+    num12 = den12 = num26 = den26 = num9 = den9 = 0.0
+    
+    # Running sums with the number of valid values currently in each window
+    s50 = vol20 = 0.0
+    s20 = ss20 = ret20 = rss20 = tr14 = 0.0
+    c_s20 = c_ss20 = c_ret20 = c_rss20 = c_tr14 = 0.0
+    n20 = n50 = nvol20 = nret20 = ntr14 = 0
+    
+    for i in range(n):
+        x = close[i]
+        
+        # Simple moving averages and Bollinger sums
+        if not np.isnan(x):
+            s20, c_s20 = _kahan_add(s20, c_s20, x)
+            ss20, c_ss20 = _kahan_add(ss20, c_ss20, x * x)
+            s50 += x
+            n20 += 1
+            n50 += 1
+        if i >= 20 and not np.isnan(close[i - 20]):
+            y = close[i - 20]
+            s20, c_s20 = _kahan_add(s20, c_s20, -y)
+            ss20, c_ss20 = _kahan_add(ss20, c_ss20, -y * y)
+            n20 -= 1
+        if i >= 50 and not np.isnan(close[i - 50]):
+            s50 -= close[i - 50]
+            n50 -= 1
+        if not np.isnan(volume[i]):
+            vol20 += volume[i]
+            nvol20 += 1
+        if i >= 20 and not np.isnan(volume[i - 20]):
+            vol20 -= volume[i - 20]
+            nvol20 -= 1
+        
+        if n20 == 20:
+            mean = s20 / 20.0
+            std = np.sqrt(max((ss20 - s20 * mean) / 19.0, 0.0))
+            sma_20[i] = mean
+            bb_middle[i] = mean
+            bb_upper[i] = mean + 2.0 * std
+            bb_lower[i] = mean - 2.0 * std
+            bb_width[i] = bb_upper[i] - bb_lower[i]
+            bb_position[i] = _div(x - bb_lower[i], bb_width[i])
+        if nvol20 == 20:
+            volume_sma[i] = vol20 / 20.0
+            volume_ratio[i] = _div(volume[i], volume_sma[i])
+        if n50 == 50:
+            sma_50[i] = s50 / 50.0
+        
+        # EMAs, MACD and its signal line
+        if np.isnan(x):
+            num12 *= d12
+            den12 *= d12
+            num26 *= d26
+            den26 *= d26
+        else:
+            num12 = x + d12 * num12
+            den12 = 1.0 + d12 * den12
+            num26 = x + d26 * num26
+            den26 = 1.0 + d26 * den26
+        if den12 > 0.0:
+            ema_12[i] = num12 / den12
+            ema_26[i] = num26 / den26
+            m = ema_12[i] - ema_26[i]
+            num9 = m + d9 * num9
+            den9 = 1.0 + d9 * den9
+            macd[i] = m
+            macd_signal[i] = num9 / den9
+            macd_hist[i] = m - macd_signal[i]
+        
+        # Momentum
+        if i >= 10:
+            momentum_10[i] = x / close[i - 10] - 1.0
+        if i >= 20:
+            momentum_20[i] = x / close[i - 20] - 1.0
+        if i >= 50:
+            momentum_50[i] = x / close[i - 50] - 1.0
+        
+        # Volatility of daily returns and true range (both start at bar 1)
+        if i >= 1:
+            r = x / close[i - 1] - 1.0
+            if not np.isnan(r):
+                ret20, c_ret20 = _kahan_add(ret20, c_ret20, r)
+                rss20, c_rss20 = _kahan_add(rss20, c_rss20, r * r)
+                nret20 += 1
+            if i >= 21:
+                r_out = close[i - 20] / close[i - 21] - 1.0
+                if not np.isnan(r_out):
+                    ret20, c_ret20 = _kahan_add(ret20, c_ret20, -r_out)
+                    rss20, c_rss20 = _kahan_add(rss20, c_rss20, -r_out * r_out)
+                    nret20 -= 1
+            
+            prev = close[i - 1]
+            if not (np.isnan(high[i]) or np.isnan(low[i]) or np.isnan(prev)):
+                tr[i] = max(high[i] - low[i], max(abs(high[i] - prev), abs(low[i] - prev)))
+                tr14, c_tr14 = _kahan_add(tr14, c_tr14, tr[i])
+                ntr14 += 1
+            if i >= 15 and not np.isnan(tr[i - 14]):
+                tr14, c_tr14 = _kahan_add(tr14, c_tr14, -tr[i - 14])
+                ntr14 -= 1
+        if nret20 == 20:
+            volatility_20[i] = np.sqrt(max((rss20 - ret20 * ret20 / 20.0) / 19.0, 0.0))
+        if ntr14 == 14:
+            atr[i] = tr14 / 14.0
+
+def _kernel_source_hash() -> str:
+    """Hash of the indicator kernel and the helpers it calls"""
+    funcs = (_div, _kahan_add, _wilder_rsi, _indicators_kernel)
+    source = ''.join(inspect.getsource(getattr(func, 'py_func', func)) for func in funcs)
+    return hashlib.blake2b(source.encode()).hexdigest()[:16]
+
+# Name of the extension built by build_indicators_aot.py. The source hash is part of
+# the name, so a build of an older kernel is never picked up.
+AOT_MODULE = f'starsim_indicators_aot_{_kernel_source_hash()}'
+
+try:
+    # Skips the JIT compile on first use
+    _compiled_indicators_kernel = importlib.import_module(AOT_MODULE).indicators_kernel
+except ImportError:
+    _compiled_indicators_kernel = _indicators_kernel
+
+def _pairwise_correlation(x: np.ndarray) -> np.ndarray:
+    """Pearson correlation of the columns of x over pairwise-complete rows.
+    
+    Equivalent to DataFrame.corr() but built from a handful of matrix products
+    over the whole (T, N) panel instead of N^2 per-pair passes.
+    """
+    mask = ~np.isnan(x)
+    m = mask.astype(np.float64)
+    x = np.where(mask, x, 0.0)
+    
+    count = m.T @ m                 # rows where both columns are present
+    sum_x = x.T @ m                 # sum of column i over those rows
+    sum_xx = (x * x).T @ m
+    sum_xy = x.T @ x
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / count
+        var = sum_xx - sum_x * sum_x / count
+        corr = cov / np.sqrt(var * var.T)
+    
+    corr[count < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+def _max_drawdown(prices: np.ndarray) -> np.ndarray:
+    """Maximum drawdown of each column of prices (or of a 1-D price array).
+    
+    Works in log space: log(p) minus its running maximum, mapped back with expm1.
+    """
+    log_prices = np.log(prices)
+    running_max = np.fmax.accumulate(log_prices, axis=0)
+    return np.expm1(np.nanmin(log_prices - running_max, axis=0))
+
+def solve_markowitz(mu: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """Mean-variance weights proportional to cov^-1 mu, scaled so sum(|w|) == 1.
+    
+    Negative weights are shorts. Scaling by gross exposure rather than the net
+    sum keeps each weight's sign when the net position is short. Raises
+    ValueError when the solution is close to dollar-neutral, since it then has
+    no meaningful allocation to report. Solves through a Cholesky
+    factorization rather than forming the inverse.
+    """
+    from scipy.linalg import cho_factor, cho_solve
+    
+    factor = cho_factor(cov + 1e-8 * np.eye(len(cov)))
+    weights = cho_solve(factor, mu)
+    gross = np.abs(weights).sum()
+    if not gross > 0 or abs(weights.sum()) < 1e-6 * gross:
+        raise ValueError("mean-variance solution is degenerate (net exposure near zero)")
+    return weights / gross
 
 class PaperTradingSetup:
     def __init__(self):
@@ -78,129 +412,177 @@ class PaperTradingSetup:
             print(f"Connection error: {e}")
             return False
     
-    def download_market_data(self, days_back: int = 365):
+    def download_market_data(self, days_back: int = 365, use_cache: bool = True):
         """Download historical market data for backtesting"""
-        print(f"Downloading {days_back} days of market data...")
-        
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         
+        key = hashlib.blake2b(
+            json.dumps([sorted(self.universe), str(start_date.date()), str(end_date.date())]).encode()
+        ).hexdigest()[:16]
+        cache_path = CACHE_DIR / f'{key}.parquet'
+        
+        if use_cache and cache_path.is_file() and time.time() - cache_path.stat().st_mtime < CACHE_MAX_AGE:
+            data = self.load_market_data(cache_path)
+            os.makedirs('data', exist_ok=True)
+            shutil.copyfile(cache_path, MARKET_DATA_PATH)
+            print(f"Loaded {len(data)} symbols from cache {cache_path}")
+            return data
+        
+        print(f"Downloading {days_back} days of market data...")
+        
+        # One bulk request for the whole universe instead of one per ticker
+        try:
+            panel = yf.download(
+                self.universe,
+                start=start_date,
+                end=end_date,
+                group_by='ticker',
+                auto_adjust=True,
+                threads=True,
+                progress=False
+            )
+        except Exception as e:
+            print(f"❌ Failed to download market data: {e}")
+            panel = None
+        
         data = {}
-        for symbol in self.universe:
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(start=start_date, end=end_date)
+        if panel is not None:
+            downloaded = set(panel.columns.get_level_values(0))
+            for symbol in self.universe:
+                hist = panel[symbol].dropna(how='all') if symbol in downloaded else None
+                if hist is None or hist.empty:
+                    print(f"❌ Failed to download {symbol}: no data returned")
+                    continue
                 data[symbol] = hist
                 print(f"✅ Downloaded {symbol}: {len(hist)} days")
-            except Exception as e:
-                print(f"❌ Failed to download {symbol}: {e}")
         
-        # Save to CSV
-        os.makedirs('data', exist_ok=True)
-        for symbol, df in data.items():
-            df.to_csv(f'data/{symbol}_history.csv')
+        # Save as a single columnar file keyed by (symbol, Date); the date level keeps
+        # yfinance's index name so cached and fresh frames look the same
+        if data:
+            os.makedirs('data', exist_ok=True)
+            pd.concat(data, names=['symbol']).to_parquet(
+                MARKET_DATA_PATH, engine='pyarrow', compression='zstd'
+            )
+            print(f"Market data saved to {MARKET_DATA_PATH}")
+            
+            # Only cache complete downloads so failed symbols are retried next run
+            missing = len(self.universe) - len(data)
+            if missing == 0:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(MARKET_DATA_PATH, cache_path)
+            else:
+                print(f"⚠️  {missing} symbols missing, not caching this download")
         
-        print(f"Market data saved to 'data' directory")
         return data
     
+    def load_market_data(self, path: str = MARKET_DATA_PATH) -> Dict[str, pd.DataFrame]:
+        """Load market data previously saved by download_market_data"""
+        panel = pd.read_parquet(path, engine='pyarrow')
+        return {
+            symbol: df.droplevel('symbol')
+            for symbol, df in panel.groupby(level='symbol', sort=False)
+        }
+    
     def calculate_technical_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Calculate technical indicators for ML features"""
-        df = data.copy()
-        
-        # Price-based indicators
-        df['SMA_20'] = df['Close'].rolling(window=20).mean()
-        df['SMA_50'] = df['Close'].rolling(window=50).mean()
-        df['EMA_12'] = df['Close'].ewm(span=12).mean()
-        df['EMA_26'] = df['Close'].ewm(span=26).mean()
-        
-        # RSI
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        df['MACD'] = df['EMA_12'] - df['EMA_26']
-        df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
-        df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-        
-        # Bollinger Bands
-        df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-        bb_std = df['Close'].rolling(window=20).std()
-        df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-        df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
-        df['BB_Width'] = df['BB_Upper'] - df['BB_Lower']
-        df['BB_Position'] = (df['Close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
-        
-        # Volume indicators
-        df['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
-        df['Volume_Ratio'] = df['Volume'] / df['Volume_SMA']
-        
-        # Momentum
-        df['Momentum_10'] = df['Close'] / df['Close'].shift(10) - 1
-        df['Momentum_20'] = df['Close'] / df['Close'].shift(20) - 1
-        df['Momentum_50'] = df['Close'] / df['Close'].shift(50) - 1
-        
-        # Volatility
-        df['Volatility_20'] = df['Close'].pct_change().rolling(window=20).std()
-        
-        # Average True Range
-        df['TR'] = np.maximum(df['High'] - df['Low'], 
-                             np.maximum(abs(df['High'] - df['Close'].shift(1)),
-                                       abs(df['Low'] - df['Close'].shift(1))))
-        df['ATR'] = df['TR'].rolling(window=14).mean()
-        
-        return df
+        # One column-major buffer for every indicator, so each column is contiguous
+        out = np.empty((len(data), len(INDICATOR_COLUMNS)), dtype=np.float64, order='F')
+        _compiled_indicators_kernel(
+            data['High'].to_numpy(dtype=np.float64),
+            data['Low'].to_numpy(dtype=np.float64),
+            data['Close'].to_numpy(dtype=np.float64),
+            data['Volume'].to_numpy(dtype=np.float64),
+            out
+        )
+        
+        indicators = pd.DataFrame(out, columns=INDICATOR_COLUMNS, index=data.index)
+        return pd.concat([data, indicators], axis=1)
     
     def analyze_correlations(self, data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         """Analyze correlations between assets"""
-        returns = pd.DataFrame()
-        
-        for symbol, df in data.items():
-            if len(df) > 1:
-                returns[symbol] = df['Close'].pct_change()
-        
-        correlation_matrix = returns.corr()
-        
-        # Plot heatmap
-        plt.figure(figsize=(12, 10))
-        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
-        plt.title('Asset Correlation Matrix')
-        plt.tight_layout()
-        plt.savefig('correlation_heatmap.png')
-        plt.close()
+        # Returns are taken per symbol before aligning, so a date one symbol lacks
+        # does not drop another symbol's move across it
+        returns = pd.concat(
+            {symbol: df['Close'].pct_change() for symbol, df in data.items() if len(df) > 1}, axis=1
+        )
+        
+        correlation_matrix = pd.DataFrame(
+            _pairwise_correlation(returns.to_numpy(dtype=np.float64)),
+            index=returns.columns, columns=returns.columns
+        )
+        
+        # Plot heatmap (opt-in, it is the slowest part of the analysis)
+        if os.environ.get('STARSIM_PLOTS'):
+            symbols = correlation_matrix.columns
+            plt.figure(figsize=(12, 10))
+            plt.imshow(correlation_matrix.to_numpy(), cmap='coolwarm', vmin=-1, vmax=1)
+            plt.colorbar()
+            plt.xticks(range(len(symbols)), symbols, rotation=90)
+            plt.yticks(range(len(symbols)), symbols)
+            plt.title('Asset Correlation Matrix')
+            plt.tight_layout()
+            plt.savefig('correlation_heatmap.png')
+            plt.close()
         
         return correlation_matrix
     
     def generate_risk_metrics(self, data: Dict[str, pd.DataFrame]) -> Dict:
         """Generate risk metrics for each asset"""
-        risk_metrics = {}
-        
-        for symbol, df in data.items():
-            if len(df) > 252:  # Need at least 1 year of data
-                returns = df['Close'].pct_change().dropna()
-                
-                risk_metrics[symbol] = {
-                    'annual_return': returns.mean() * 252,
-                    'annual_volatility': returns.std() * np.sqrt(252),
-                    'sharpe_ratio': (returns.mean() * 252) / (returns.std() * np.sqrt(252)),
-                    'max_drawdown': self.calculate_max_drawdown(df['Close']),
-                    'var_95': returns.quantile(0.05),
-                    'skewness': returns.skew(),
-                    'kurtosis': returns.kurtosis()
-                }
-        
-        return risk_metrics
+        # Need at least 1 year of data
+        eligible = {symbol: df['Close'] for symbol, df in data.items() if len(df) > 252}
+        if not eligible:
+            return {}
+        
+        # Every moment is computed column-wise over one (T, N) panel of returns.
+        # Returns are taken per symbol before aligning, so gaps in one symbol's
+        # calendar leave the others untouched.
+        closes = pd.concat(eligible, axis=1)
+        prices = closes.to_numpy(dtype=np.float64)
+        returns = pd.concat(
+            {symbol: close.pct_change() for symbol, close in eligible.items()}, axis=1
+        ).to_numpy(dtype=np.float64)
+        
+        n = np.sum(~np.isnan(returns), axis=0).astype(np.float64)
+        mean = np.nanmean(returns, axis=0)
+        std = np.nanstd(returns, axis=0, ddof=1)
+        var_95 = np.nanquantile(returns, 0.05, axis=0)
+        
+        # Bias-corrected skewness and excess kurtosis, as pandas reports them
+        dev = returns - mean
+        m2 = np.nanmean(dev ** 2, axis=0)
+        m3 = np.nanmean(dev ** 3, axis=0)
+        m4 = np.nanmean(dev ** 4, axis=0)
+        skewness = np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5
+        kurtosis = ((n + 1) * (m4 / m2 ** 2 - 3) + 6) * (n - 1) / ((n - 2) * (n - 3))
+        
+        annual_return = mean * 252
+        annual_volatility = std * np.sqrt(252)
+        sharpe_ratio = annual_return / annual_volatility
+        max_drawdown = _max_drawdown(prices)
+        
+        metrics = zip(annual_return.tolist(), annual_volatility.tolist(), sharpe_ratio.tolist(),
+                      max_drawdown.tolist(), var_95.tolist(), skewness.tolist(), kurtosis.tolist())
+        
+        return {
+            symbol: {
+                'annual_return': ret,
+                'annual_volatility': vol,
+                'sharpe_ratio': sharpe,
+                'max_drawdown': mdd,
+                'var_95': var,
+                'skewness': skew,
+                'kurtosis': kurt
+            }
+            for symbol, (ret, vol, sharpe, mdd, var, skew, kurt) in zip(closes.columns, metrics)
+        }
     
     def calculate_max_drawdown(self, prices: pd.Series) -> float:
         """Calculate maximum drawdown"""
-        cumulative = (1 + prices.pct_change()).cumprod()
-        running_max = cumulative.expanding().max()
-        drawdown = (cumulative - running_max) / running_max
-        return drawdown.min()
+        return float(_max_drawdown(prices.to_numpy(dtype=np.float64)))
     
-    def create_portfolio_suggestions(self, risk_metrics: Dict) -> Dict:
+    def create_portfolio_suggestions(self, risk_metrics: Dict,
+                                     correlation_matrix: pd.DataFrame = None) -> Dict:
         """Create portfolio allocation suggestions"""
         # Risk-adjusted scoring
         scores = {}
@@ -219,8 +601,30 @@ class PaperTradingSetup:
             'conservative': self.create_conservative_portfolio(sorted_scores)
         }
         
+        if correlation_matrix is not None:
+            try:
+                portfolios['mean_variance'] = self.create_mean_variance_portfolio(
+                    risk_metrics, correlation_matrix
+                )
+            except (ImportError, ValueError, np.linalg.LinAlgError) as e:
+                print(f"Skipping mean-variance portfolio: {e}")
+        
         return portfolios
     
+    def create_mean_variance_portfolio(self, risk_metrics: Dict,
+                                       correlation_matrix: pd.DataFrame) -> Dict:
+        """Create Markowitz allocation from expected returns and the covariance matrix"""
+        symbols = [s for s in correlation_matrix.columns if s in risk_metrics]
+        corr = correlation_matrix.loc[symbols, symbols].to_numpy(dtype=np.float64)
+        mu = np.array([risk_metrics[s]['annual_return'] for s in symbols])
+        vol = np.array([risk_metrics[s]['annual_volatility'] for s in symbols])
+        
+        # Covariance from the correlation matrix: V_ab = sigma_a * rho_ab * sigma_b
+        cov = corr * np.outer(vol, vol)
+        weights = solve_markowitz(mu, cov)
+        
+        return dict(zip(symbols, weights.tolist()))
+    
     def create_aggressive_portfolio(self, sorted_scores: List[Tuple[str, float]]) -> Dict:
         """Create aggressive portfolio allocation"""
         allocation = {}
@@ -287,26 +691,17 @@ class PaperTradingSetup:
     
     def generate_trading_calendar(self, start_date: datetime, end_date: datetime) -> List[datetime]:
         """Generate trading calendar (weekdays, excluding holidays)"""
-        trading_days = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            # Skip weekends
-            if current_date.weekday() < 5:  # Monday = 0, Friday = 4
-                trading_days.append(current_date)
-            current_date += timedelta(days=1)
-        
-        return trading_days
+        # Weekdays minus NYSE market holidays, generated in one vectorized call
+        business_day = CustomBusinessDay(calendar=_NYSEHolidayCalendar())
+        return pd.date_range(start_date, end_date, freq=business_day).to_pydatetime().tolist()
     
     def save_configuration(self):
         """Save configuration to files"""
         # Save main config
-        with open('config.json', 'w') as f:
-            json.dump(self.config, f, indent=2)
+        write_json('config.json', self.config)
         
         # Save universe
-        with open('universe.json', 'w') as f:
-            json.dump(self.universe, f, indent=2)
+        write_json('universe.json', self.universe)
         
         print("Configuration saved to config.json and universe.json")
     
@@ -324,9 +719,10 @@ class PaperTradingSetup:
         
         # 3. Calculate technical indicators
         print("Calculating technical indicators...")
-        enhanced_data = {}
-        for symbol, df in market_data.items():
-            enhanced_data[symbol] = self.calculate_technical_indicators(df)
+        # The kernel releases the GIL, so symbols are processed on a thread pool
+        with ThreadPoolExecutor() as executor:
+            enhanced = executor.map(self.calculate_technical_indicators, market_data.values())
+            enhanced_data = dict(zip(market_data.keys(), enhanced))
         
         # 4. Analyze correlations
         print("Analyzing asset correlations...")
@@ -338,17 +734,14 @@ class PaperTradingSetup:
         
         # 6. Create portfolio suggestions
         print("Creating portfolio suggestions...")
-        portfolios = self.create_portfolio_suggestions(risk_metrics)
+        portfolios = self.create_portfolio_suggestions(risk_metrics, correlation_matrix)
         
         # 7. Save everything
         self.save_configuration()
         
         # Save analysis results
-        with open('risk_metrics.json', 'w') as f:
-            json.dump(risk_metrics, f, indent=2, default=str)
-        
-        with open('portfolio_suggestions.json', 'w') as f:
-            json.dump(portfolios, f, indent=2)
+        write_json('risk_metrics.json', risk_metrics)
+        write_json('portfolio_suggestions.json', portfolios)
         
         correlation_matrix.to_csv('correlation_matrix.csv')
         
@@ -356,7 +749,7 @@ class PaperTradingSetup:
         print("\nNext steps:")
         print("1. Review portfolio_suggestions.json for allocation ideas")
         print("2. Check risk_metrics.json for individual asset analysis")
-        print("3. Examine correlation_heatmap.png for diversification insights")
+        print("3. Examine correlation_heatmap.png for diversification insights (set STARSIM_PLOTS=1 to generate it)")
         print("4. Compile and run the advanced_paper_trading.cpp")
         print("5. Monitor performance and adjust strategies as needed")
         